@@ -1,14 +1,30 @@
 #!/usr/bin/env python3
 from __future__ import annotations
-import os, json, re
-import tkinter as tk
-from tkinter import ttk, filedialog, messagebox
-import customtkinter as ctk
-from typing import Dict, List, Tuple
+import os, sys, json, re, time, functools
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Set, Tuple
+
+# optional orjson (faster preset load/save)
+try:
+    import orjson
+    ORJSON = True
+except Exception:
+    ORJSON = False
 
 APPDATA_SUBDIR = "File Organizer"
 
+# Characters Windows does not allow in folder names
+_CAT_RE = re.compile(r'[\\/:*?"<>|]')
+# Anything that can't be part of an extension; ASCII is stripped with str.translate, _EXT_RE only
+# runs on the rare part that still holds non-ASCII characters
+_EXT_RE = re.compile(r"[^a-zA-Z0-9]")
+_EXT_DEL = str.maketrans("", "", "".join(c for c in map(chr, range(128)) if not c.isalnum()))
+# Stripe tags per row, indexed by (1-based) row number % 2
+_STRIPE_TAGS = (("even",), ("odd",))
+
 # ------------------ Helpers ------------------
+@functools.lru_cache(maxsize=1)
 def get_appdata_dir():
     base = os.getenv("APPDATA") or os.path.expanduser("~")
     path = os.path.join(base, APPDATA_SUBDIR)
@@ -20,19 +36,82 @@ def appdata_file(name):
 
 def read_json(path):
     try:
-        with open(path, "r", encoding="utf-8") as f:
-            return json.load(f)
+        with open(path, "rb") as f:
+            data = f.read()
+        return orjson.loads(data) if ORJSON else json.loads(data)
     except Exception:
         return {}
 
-def write_json(path, data):
+def write_json(path, data, *, pretty=False):
+    # Compact by default (files only the app itself reads); pretty=True for files meant for people
     tmp = path + ".tmp"
-    with open(tmp, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2)
+    if ORJSON:
+        with open(tmp, "wb") as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2 if pretty else None))
+    else:
+        with open(tmp, "w", encoding="utf-8") as f:
+            if pretty:
+                json.dump(data, f, indent=2, ensure_ascii=False)
+            else:
+                json.dump(data, f, separators=(",", ":"), ensure_ascii=False)
     os.replace(tmp, path)
 
+def _parse_exts(val):
+    # "MP3, .wav, o!gg" -> ["mp3", "wav", "ogg"]
+    cleaned = []
+    for part in val.split(","):
+        safe = part.translate(_EXT_DEL)
+        if not safe.isascii():
+            safe = _EXT_RE.sub("", safe)
+        if safe:
+            cleaned.append(safe.lower())
+    return cleaned
+
+def _preset_items(raw):
+    # Normalise a presets mapping once at load time: {".MP3": "Audio|Music"} -> ("mp3", ["Audio", "Music"])
+    if not isinstance(raw, dict):
+        return
+    # Category names repeat across many extensions; interning makes them one shared object each
+    for k, v in raw.items():
+        cats = [sys.intern(c.strip()) for c in v.split("|")] if isinstance(v, str) else v
+        if not isinstance(cats, list): cats = [cats]
+        yield k.lstrip(".").lower(), cats
+
+def _haystack(exts, cat):
+    # Case-folded search text for one row, built once per row change so _search never folds per row;
+    # NUL separators keep a query from matching across two fields
+    return "\x00".join(exts) + "\x00" + cat.casefold()
+
+def _bigram_mask(text):
+    # 64-bit signature of the text's bigrams; a row can only contain q if its mask covers q's
+    mask = 0
+    for i in range(len(text) - 1):
+        mask |= 1 << (hash(text[i:i + 2]) & 63)
+    return mask
+
+# ------------------ Lazy UI imports ------------------
+# tkinter/customtkinter (and PIL/darkdetect behind it) are only imported when the window is opened,
+# so importing this module for its JSON helpers stays cheap
+tk = ttk = filedialog = messagebox = ctk = None
+_window_cls = None
+
+def _lazy_tk():
+    global tk, ttk, filedialog, messagebox, ctk, _window_cls
+    if _window_cls is None:
+        import tkinter as tk
+        from tkinter import ttk, filedialog, messagebox
+        import customtkinter as ctk
+        _window_cls = type("ManageSpreadsheet", (_SpreadsheetBase, ctk.CTk), {})
+    return _window_cls
+
+def __getattr__(name):
+    # ManageSpreadsheet is built on first access (PEP 562)
+    if name == "ManageSpreadsheet":
+        return _lazy_tk()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 # ------------------ Main UI ------------------
-class ManageSpreadsheet(ctk.CTk):
+class _SpreadsheetBase:
     def __init__(self):
         super().__init__()
         ctk.set_appearance_mode("dark")
@@ -45,21 +124,31 @@ class ManageSpreadsheet(ctk.CTk):
         self.default_path = appdata_file("default_presets.json")
         self.user_path = appdata_file("user_presets.json")
 
-        raw = read_json(self.user_path)
+        # Filled by _poll_load once the background read finishes
         self.cat_to_exts: Dict[str, List[str]] = {}
-        
-        for k, v in raw.items():
-            ext = k.lstrip(".").lower()
-            cats = [c.strip() for c in v.split("|")] if isinstance(v, str) else v
-            if not isinstance(cats, list): cats = [cats]
-            for cat in cats:
-                if cat not in self.cat_to_exts:
-                    self.cat_to_exts[cat] = []
-                if ext not in self.cat_to_exts[cat]:
-                    self.cat_to_exts[cat].append(ext)
 
         self.sort_col = "c"
         self.sort_rev = False
+        self._search_after_id = None
+        self._last_search_ts = 0.0
+
+        # Rendered rows in display order; the trailing blank row is tracked separately
+        self._row_iids: List[str] = []
+        self._row_cache: List[Tuple[str, str]] = []
+        self._haystack_cache: List[str] = []
+        self._bigram_masks: List[int] = []
+        self._iid_pos: Dict[str, int] = {}
+        self._hidden: Set[str] = set()
+        self._visible_iids: List[str] = []
+        self._painted: Dict[str, int] = {}
+        self._char_index: Dict[str, Set[str]] = defaultdict(set)
+        self._cat_to_iid: Dict[str, str] = {}
+        # ext -> normal (non-whitelist) categories holding it, for the edit conflict check
+        self._ext_cats: Dict[str, Set[str]] = defaultdict(set)
+        self._blank_iid = ""
+        # Last query and its matches; a longer query containing it only rescans those rows
+        self._last_query = ""
+        self._last_matches: Set[str] = set()
 
         self._setup_styles()
         self._build_layout()
@@ -68,6 +157,31 @@ class ManageSpreadsheet(ctk.CTk):
         self.tree.bind("<Double-1>", self._on_double_click)
         self.tree.bind("<Delete>", lambda e: self._on_delete())
 
+        # Read presets off the UI thread so the window paints immediately
+        self._loading = tk.Label(self.tree, text="Loading presets...", font=("Segoe UI", 12), fg="#ddd", bg="#2b2b2b")
+        self._loading.place(relx=0.5, rely=0.5, anchor="center")
+        pool = ThreadPoolExecutor(max_workers=1)
+        future = pool.submit(read_json, self.user_path)
+        pool.shutdown(wait=False)
+        self.after(50, self._poll_load, future)
+
+    def _poll_load(self, future):
+        if not future.done():
+            self.after(50, self._poll_load, future)
+            return
+
+        for ext, cats in _preset_items(future.result()):
+            for cat in cats:
+                if cat not in self.cat_to_exts:
+                    self.cat_to_exts[cat] = []
+                if ext not in self.cat_to_exts[cat]:
+                    self.cat_to_exts[cat].append(ext)
+
+        self._loading.destroy()
+        self._loading = None
+        self._load_rows()
+        self._search()
+
     # ------------------ Styles ------------------
     def _setup_styles(self):
         style = ttk.Style()
@@ -115,7 +229,7 @@ class ManageSpreadsheet(ctk.CTk):
         ctk.CTkEntry(top, textvariable=self.search_var).pack(
             side="left", fill="x", expand=True
         )
-        self.search_var.trace_add("write", lambda *_: self._search())
+        self.search_var.trace_add("write", lambda *_: self._schedule_search())
 
         main = ctk.CTkFrame(self)
         main.pack(fill="both", expand=True, padx=10)
@@ -141,7 +255,8 @@ class ManageSpreadsheet(ctk.CTk):
         self.tree.tag_configure("even", background="#2f2f2f")
 
         vs = ttk.Scrollbar(table, orient="vertical", command=self.tree.yview)
-        self.tree.configure(yscrollcommand=vs.set)
+        self._vs = vs
+        self.tree.configure(yscrollcommand=self._on_yscroll)
         self.tree.grid(row=0, column=0, sticky="nsew")
         vs.grid(row=0, column=1, sticky="ns")
 
@@ -170,64 +285,260 @@ class ManageSpreadsheet(ctk.CTk):
 
     # ------------------ Load Rows ------------------
     def _load_rows(self):
-        self.tree.delete(*self.tree.get_children())
-        
-        wl_cats = {c: e for c, e in self.cat_to_exts.items() if c.lower().startswith("whitelist.")}
-        norm_cats = {c: e for c, e in self.cat_to_exts.items() if not c.lower().startswith("whitelist.")}
-        
-        def sort_dict(d):
-            if self.sort_col == "e":
-                return sorted(d.items(), key=lambda item: item[1][0] if item[1] else "", reverse=self.sort_rev)
-            else:
-                return sorted(d.items(), key=lambda item: item[0].lower(), reverse=self.sort_rev)
-                
-        cats_to_render = sort_dict(wl_cats) + sort_dict(norm_cats)
-        
-        idx = 1
+        # Rows whose category survives are moved into place instead of deleted and re-inserted
+        old_iids = self._cat_to_iid
+        old_rows = dict(zip(self._row_iids, self._row_cache))
+        old_painted = self._painted
+        # Anything else in the widget (stale drafts) goes; detached rows are not in get_children()
+        stale = [iid for iid in self.tree.get_children() if iid not in old_rows and iid != self._blank_iid]
+
+        self._row_iids = []
+        self._row_cache = []
+        self._haystack_cache = []
+        self._bigram_masks = []
+        self._hidden = set()
+        self._painted = {}
+        self._char_index = defaultdict(set)
+        self._ext_cats = defaultdict(set)
+        self._last_query = ""
+
+        # cat_to_exts is already grouped; split whitelist rules off in one pass and sort in place
+        wl_cats, norm_cats = [], []
+        for item in self.cat_to_exts.items():
+            (wl_cats if item[0].lower().startswith("whitelist.") else norm_cats).append(item)
+
+        if self.sort_col == "e":
+            sort_key = lambda item: item[1][0] if item[1] else ""
+        else:
+            sort_key = lambda item: item[0].lower()
+        wl_cats.sort(key=sort_key, reverse=self.sort_rev)
+        norm_cats.sort(key=sort_key, reverse=self.sort_rev)
+
+        cats_to_render = wl_cats + norm_cats
+
+        # Build every row in Python first so the Tk side is one tight move/insert loop
+        join = ", ".join
         for cat, exts in cats_to_render:
-            tag = "even" if idx % 2 == 0 else "odd"
-            self.tree.insert("", "end", values=(idx, ", ".join(exts), cat), tags=(tag,))
+            hay = _haystack(exts, cat)
+            self._row_cache.append((join(exts), cat))
+            self._haystack_cache.append(hay)
+            self._bigram_masks.append(_bigram_mask(hay))
+
+        # Bound methods hoisted out of the per-row loop
+        insert, move, pop_old = self.tree.insert, self.tree.move, old_iids.pop
+        painted, add_iid = self._painted, self._row_iids.append
+        idx = 1
+        for joined, cat in self._row_cache:
+            iid = pop_old(cat, None)
+            if iid is None:
+                iid = insert("", "end", values=(idx, joined, cat), tags=_STRIPE_TAGS[idx % 2])
+                painted[iid] = idx
+            else:
+                move(iid, "", "end")
+                # Changed text is repainted by _refresh_indexes when the row is in view
+                painted[iid] = old_painted.get(iid) if old_rows[iid][0] == joined else None
+            add_iid(iid)
             idx += 1
-
-        tag = "even" if idx % 2 == 0 else "odd"
-        self.tree.insert("", "end", values=(idx, "", ""), tags=(tag,))
+        stale.extend(old_iids.values())
+        if stale:
+            self.tree.delete(*stale)
+        self._iid_pos = {iid: i for i, iid in enumerate(self._row_iids)}
+        self._visible_iids = list(self._row_iids)
+        self._cat_to_iid = {cat: iid for iid, (_, cat) in zip(self._row_iids, self._row_cache)}
+        for joined, cat in self._row_cache:
+            self._index_exts(cat, "", joined)
+
+        # char -> rows containing it, so a one-letter query skips the substring scan
+        char_index = self._char_index
+        for iid, hay in zip(self._row_iids, self._haystack_cache):
+            for ch in set(hay):
+                char_index[ch].add(iid)
+
+        if self._blank_iid:
+            self.tree.move(self._blank_iid, "", "end")
+            self.tree.item(self._blank_iid, values=(idx, "", ""), tags=_STRIPE_TAGS[idx % 2])
+        else:
+            self._blank_iid = self.tree.insert("", "end", values=(idx, "", ""), tags=_STRIPE_TAGS[idx % 2])
+        self._painted[self._blank_iid] = idx
+        self._refresh_indexes()
+
+    def _on_yscroll(self, first, last):
+        self._vs.set(first, last)
+        self._refresh_indexes(float(first), float(last))
+
+    def _refresh_indexes(self, first=None, last=None):
+        # Renumber/restripe only rows in (or near) the viewport whose shown index is stale;
+        # rows further away are painted by _on_yscroll as they scroll into view
+        if first is None:
+            first, last = self.tree.yview()
+        visible = self._visible_iids
+        n = len(visible)
+        margin = int((last - first) * n) + 1
+        painted, rows, pos, item = self._painted, self._row_cache, self._iid_pos, self.tree.item
+        for k in range(max(0, int(first * n) - margin), min(n, int(last * n) + margin)):
+            iid = visible[k]
+            idx = k + 1
+            if painted.get(iid) != idx:
+                exts, cat = rows[pos[iid]]
+                item(iid, values=(idx, exts, cat), tags=_STRIPE_TAGS[idx % 2])
+                painted[iid] = idx
+
+        idx = n + 1
+        if self._painted.get(self._blank_iid) != idx:
+            self.tree.item(self._blank_iid, tags=_STRIPE_TAGS[idx % 2])
+            self.tree.set(self._blank_iid, "i", idx)
+            self._painted[self._blank_iid] = idx
+
+    def _sort_key(self, cat):
+        if self.sort_col == "e":
+            exts = self.cat_to_exts.get(cat)
+            return exts[0] if exts else ""
+        return cat.lower()
+
+    def _index_chars(self, iid, old_hay, new_hay):
+        self._last_query = ""
+        old_chars, new_chars = set(old_hay), set(new_hay)
+        for ch in old_chars - new_chars:
+            self._char_index[ch].discard(iid)
+        for ch in new_chars - old_chars:
+            self._char_index[ch].add(iid)
+
+    def _index_exts(self, cat, old_joined, new_joined):
+        if cat.lower().startswith("whitelist."):
+            return
+        old = set(old_joined.split(", ")) if old_joined else set()
+        new = set(new_joined.split(", ")) if new_joined else set()
+        for ext in old - new:
+            cats = self._ext_cats[ext]
+            cats.discard(cat)
+            if not cats:
+                del self._ext_cats[ext]
+        for ext in new - old:
+            self._ext_cats[ext].add(cat)
+
+    def _update_row(self, cat):
+        # Re-render one existing category row in place after its extensions changed
+        iid = self._cat_to_iid[cat]
+        pos = self._iid_pos[iid]
+        exts = self.cat_to_exts[cat]
+        joined = ", ".join(exts)
+        hay = _haystack(exts, cat)
+        self._index_chars(iid, self._haystack_cache[pos], hay)
+        self._index_exts(cat, self._row_cache[pos][0], joined)
+        self._row_cache[pos] = (joined, cat)
+        self._haystack_cache[pos] = hay
+        self._bigram_masks[pos] = _bigram_mask(hay)
+        self.tree.set(iid, "e", joined)
+
+    def _insert_row(self, cat):
+        # Insert a new category row at its sorted position (whitelist rows stay on top)
+        is_wl = cat.lower().startswith("whitelist.")
+        n_wl = sum(1 for _, c in self._row_cache if c.lower().startswith("whitelist."))
+        lo, hi = (0, n_wl) if is_wl else (n_wl, len(self._row_cache))
+        key = self._sort_key(cat)
+        pos = hi
+        for i in range(lo, hi):
+            k = self._sort_key(self._row_cache[i][1])
+            if (k < key) if self.sort_rev else (k > key):
+                pos = i
+                break
+
+        exts = self.cat_to_exts[cat]
+        joined = ", ".join(exts)
+        hay = _haystack(exts, cat)
+        tree_pos = sum(1 for iid in self._row_iids[:pos] if iid not in self._hidden)
+        idx = tree_pos + 1
+        iid = self.tree.insert("", tree_pos, values=(idx, joined, cat), tags=_STRIPE_TAGS[idx % 2])
+
+        self._row_iids.insert(pos, iid)
+        self._row_cache.insert(pos, (joined, cat))
+        self._haystack_cache.insert(pos, hay)
+        self._bigram_masks.insert(pos, _bigram_mask(hay))
+        for i in range(pos, len(self._row_iids)):
+            self._iid_pos[self._row_iids[i]] = i
+        self._visible_iids.insert(tree_pos, iid)
+        self._painted[iid] = idx
+        self._cat_to_iid[cat] = iid
+        self._index_chars(iid, "", hay)
+        self._index_exts(cat, "", joined)
+
+    def _remove_row(self, iid):
+        # Drop one rendered row and its cache entries; callers refresh the indexes afterwards
+        pos = self._iid_pos.pop(iid)
+        self._last_query = ""
+        joined, cat = self._row_cache[pos]
+        self._cat_to_iid.pop(cat, None)
+        self._index_exts(cat, joined, "")
+        self.tree.delete(iid)
+        for ch in set(self._haystack_cache[pos]):
+            self._char_index[ch].discard(iid)
+        del self._row_iids[pos], self._row_cache[pos], self._haystack_cache[pos], self._bigram_masks[pos]
+        self._painted.pop(iid, None)
+        if iid in self._hidden:
+            self._hidden.discard(iid)
+        else:
+            self._visible_iids.remove(iid)
+        for i in range(pos, len(self._row_iids)):
+            self._iid_pos[self._row_iids[i]] = i
 
     # ------------------ Search ------------------
+    def _schedule_search(self):
+        # Throttle: refilter at once if the last run is over 150 ms old, otherwise
+        # fold the keystroke into one trailing run so fast typing still updates
+        if self._search_after_id:
+            self.after_cancel(self._search_after_id)
+            self._search_after_id = None
+        if time.monotonic() - self._last_search_ts >= 0.15:
+            self._search()
+        else:
+            self._search_after_id = self.after(150, self._search)
+
     def _search(self):
-        q = self.search_var.get().strip().lower()
+        self._search_after_id = None
+        self._last_search_ts = time.monotonic()
+        q = self.search_var.get().strip().casefold()
+
+        scan = False
         if not q:
-            self._load_rows()
-            return
-            
-        self.tree.delete(*self.tree.get_children())
-        
-        matched_cats = {}
-        for cat, exts in self.cat_to_exts.items():
-            matching_exts = [e for e in exts if q in e]
-            if q in cat.lower() or matching_exts:
-                matched_cats[cat] = exts
-
-        wl_cats = {c: e for c, e in matched_cats.items() if c.lower().startswith("whitelist.")}
-        norm_cats = {c: e for c, e in matched_cats.items() if not c.lower().startswith("whitelist.")}
-        
-        def sort_dict(d):
-            if self.sort_col == "e":
-                return sorted(d.items(), key=lambda item: item[1][0] if item[1] else "", reverse=self.sort_rev)
+            matches = None
+        elif len(q) == 1:
+            matches = self._char_index.get(q, set())
+        elif self._last_query and self._last_query in q:
+            hays, masks, pos = self._haystack_cache, self._bigram_masks, self._iid_pos
+            qm = _bigram_mask(q)
+            matches = {iid for iid in self._last_matches
+                       if masks[pos[iid]] & qm == qm and q in hays[pos[iid]]}
+        else:
+            # Fresh query: the substring test runs inside the visibility pass below
+            matches, scan = set(), True
+            qm = _bigram_mask(q)
+
+        # Rows stay alive between searches; only rows whose visibility changes touch Tk
+        hidden = set()
+        visible = []
+        was_hidden, reattach, detach = self._hidden, self.tree.reattach, self.tree.detach
+        for iid, hay, mask in zip(self._row_iids, self._haystack_cache, self._bigram_masks):
+            if scan:
+                # The mask test rules most rows out before the substring check
+                shown = mask & qm == qm and q in hay
+                if shown:
+                    matches.add(iid)
             else:
-                return sorted(d.items(), key=lambda item: item[0].lower(), reverse=self.sort_rev)
-                
-        cats_to_render = sort_dict(wl_cats) + sort_dict(norm_cats)
-        
-        idx = 1
-        for cat, exts in cats_to_render:
-            tag = "even" if idx % 2 == 0 else "odd"
-            self.tree.insert("", "end", values=(idx, ", ".join(exts), cat), tags=(tag,))
-            idx += 1
-            
-        tag = "even" if idx % 2 == 0 else "odd"
-        self.tree.insert("", "end", values=(idx, "", ""), tags=(tag,))
+                shown = matches is None or iid in matches
+            if shown:
+                if iid in was_hidden:
+                    reattach(iid, "", len(visible))
+                visible.append(iid)
+            else:
+                if iid not in was_hidden:
+                    detach(iid)
+                hidden.add(iid)
+        self._hidden = hidden
+        self._visible_iids = visible
+        self._last_query, self._last_matches = q, matches
 
-        
+        self.tree.move(self._blank_iid, "", "end")
+        self._refresh_indexes()
 
     # ------------------ Double Click Edit ------------------
     def _on_double_click(self, event):
@@ -239,11 +550,27 @@ class ManageSpreadsheet(ctk.CTk):
         if col == "#1":
             return
 
-        key = "e" if col == "#2" else "c"
-        old_cat = self.tree.set(rowid, "c")
-        old_val = self.tree.set(rowid, key)
+        self._open_editor(rowid, "e" if col == "#2" else "c")
+
+    def _open_editor(self, rowid, key):
+        # Opens the inline editor on a known row/column ("e" or "c") without re-identifying the cell
+        # Edits made before the presets have loaded would be merged with them afterwards
+        if self._loading is not None:
+            return
+        # bbox is one Tcl call, and empty for a row scrolled out of view
+        bbox = self.tree.bbox(rowid, key)
+        if not bbox:
+            return
+
+        # Rendered rows are read from the row cache; only the blank/new row lives in the widget
+        row_index = self._iid_pos.get(rowid)
+        if row_index is not None:
+            old_exts, old_cat = self._row_cache[row_index]
+        else:
+            old_exts, old_cat = self.tree.set(rowid, "e"), self.tree.set(rowid, "c")
+        old_val = old_exts if key == "e" else old_cat
 
-        x, y, w, h = self.tree.bbox(rowid, col)
+        x, y, w, h = bbox
         entry = ttk.Entry(self.tree)
         entry.place(x=x, y=y, width=w, height=h)
         entry.insert(0, old_val)
@@ -270,23 +597,18 @@ class ManageSpreadsheet(ctk.CTk):
 
             # ---------- Silent sanitation ----------
             if key == "e":
-                cleaned = []
-                for part in raw.split(","):
-                    safe = re.sub(r"[^a-zA-Z0-9]", "", part)
-                    if safe:
-                        cleaned.append(safe.lower())
-                new_val = ", ".join(cleaned)
+                new_val = ", ".join(_parse_exts(raw))
             else:
-                new_val = re.sub(r'[\\/:*?"<>|]', "", raw).strip().title()
+                new_val = _CAT_RE.sub("", raw).strip().title()
 
             # ---------- Update UI ----------
             self.tree.set(rowid, key, new_val)
             entry.destroy()
 
-            exts = self.tree.set(rowid, "e").strip()
-            cat = self.tree.set(rowid, "c").strip()
+            exts, cat = (new_val, old_cat.strip()) if key == "e" else (old_exts.strip(), new_val)
 
-            is_new_row = rowid == self.tree.get_children()[-1]
+            # Only rendered preset rows are indexed; anything else is the blank/new row
+            is_new_row = row_index is None
 
             if not exts or not cat:
                 # Revert visually if left blank on an existing row
@@ -294,13 +616,13 @@ class ManageSpreadsheet(ctk.CTk):
                     self.tree.set(rowid, key, old_val)
                 return
 
-            parts = [p for p in (x.strip() for x in exts.split(",")) if p]
+            parts = _parse_exts(exts)
 
             # ---------- Update data model ----------
             if not cat.lower().startswith("whitelist."):
                 for p in parts:
-                    for exist_cat, exist_exts in self.cat_to_exts.items():
-                        if exist_cat != old_cat and not exist_cat.lower().startswith("whitelist.") and p in exist_exts:
+                    for exist_cat in self._ext_cats.get(p, ()):
+                        if exist_cat != old_cat:
                             messagebox.showerror("Conflict", f"Extension '{p}' is already inside '{exist_cat}'.\n\nExtensions can only belong to one normal category.")
                             self.tree.set(rowid, key, old_val)
                             return
@@ -317,18 +639,25 @@ class ManageSpreadsheet(ctk.CTk):
                     
             if not self.cat_to_exts[cat]:
                 self.cat_to_exts.pop(cat, None)
-                
-            self._load_rows()
-
-            # ---------- Ensure trailing empty row ----------
-            children = self.tree.get_children()
-            if children:
-                last = children[-1]
-                if self.tree.exists(last):
-                    if self.tree.set(last, "e").strip() or self.tree.set(last, "c").strip():
-                        idx = len(children) + 1
-                        tag = "even" if idx % 2 == 0 else "odd"
-                        self.tree.insert("", "end", values=(idx, "", ""), tags=(tag,))
+
+            # ---------- Patch only the affected rows ----------
+            if is_new_row:
+                # The draft's content now lives in a real row; clear it, or drop it if a newer blank row exists
+                if rowid == self._blank_iid:
+                    self.tree.item(rowid, values=(self._painted.get(rowid, ""), "", ""))
+                else:
+                    self.tree.delete(rowid)
+            elif old_cat != cat or cat not in self.cat_to_exts or (
+                    self.sort_col == "e" and self._sort_key(cat) != old_exts.split(",")[0].strip()):
+                # Renamed, merged, emptied or re-sorted: the old row goes away
+                self._remove_row(rowid)
+
+            if cat in self.cat_to_exts:
+                if cat in self._cat_to_iid:
+                    self._update_row(cat)
+                else:
+                    self._insert_row(cat)
+            self._search()
 
         def finalize(_=None):
             if entry.winfo_exists():
@@ -336,34 +665,59 @@ class ManageSpreadsheet(ctk.CTk):
 
         entry.bind("<Return>", finalize)
         entry.bind("<Escape>", lambda e: entry.destroy())
-        self.tree.bind("<Button-1>", finalize, add="+")
+
+        # Click-away commit is only bound while this editor is open
+        click_bind = self.tree.bind("<Button-1>", finalize, add="+")
+
+        def release_click(_=None):
+            if self.tree.winfo_exists():
+                self.tree.unbind("<Button-1>", click_bind)
+
+        entry.bind("<Destroy>", release_click)
 
 
         # ---------- Ensure trailing empty row ----------
-        children = self.tree.get_children()
-        last = children[-1]
-        last_ext = self.tree.set(last, "e").strip()
-        last_cat = self.tree.set(last, "c").strip()
+        # The blank row is pinned last, so there's no need to fetch every child to find it
+        last = self._blank_iid
+        _, last_ext, last_cat = self.tree.item(last, "values")
 
-        if last_ext or last_cat:
-            idx = len(children) + 1
-            tag = "even" if idx % 2 == 0 else "odd"
-            self.tree.insert("", "end", values=(idx, "", ""), tags=(tag,))
+        if str(last_ext).strip() or str(last_cat).strip():
+            idx = self._painted.get(last, len(self._visible_iids) + 1) + 1
+            self._blank_iid = self.tree.insert("", "end", values=(idx, "", ""), tags=_STRIPE_TAGS[idx % 2])
+            self._painted[self._blank_iid] = idx
 
 
     # ------------------ Buttons ------------------
     def _on_delete(self):
+        if self._loading is not None:
+            return
         sel = self.tree.selection()
         if not sel:
             return
         if not messagebox.askyesno("Confirm Delete", "Delete selected preset?"):
             return
-        cat = self.tree.set(sel[0], "c")
+        iid = sel[0]
+        pos = self._iid_pos.get(iid)
+        cat = self._row_cache[pos][1] if pos is not None else self.tree.set(iid, "c")
         if cat in self.cat_to_exts:
             self.cat_to_exts.pop(cat)
-        self._load_rows()
+
+        # Drop just the affected row(s) and renumber the ones after
+        if pos is None:
+            # A blank/draft row: the category it names (if any) is gone, and the draft is cleared
+            if cat in self._cat_to_iid:
+                self._remove_row(self._cat_to_iid[cat])
+            if iid == self._blank_iid:
+                self.tree.item(iid, values=(self._painted.get(iid, ""), "", ""))
+            else:
+                self.tree.delete(iid)
+        else:
+            self._remove_row(iid)
+        self._refresh_indexes()
 
     def _on_delete_all(self):
+        if self._loading is not None:
+            return
         if not self.tree.get_children():
             return
 
@@ -376,26 +730,18 @@ class ManageSpreadsheet(ctk.CTk):
         # clear data model
         self.cat_to_exts.clear()
 
-        # clear UI
-        self.tree.delete(*self.tree.get_children())
-
-        # add single empty row
-        self.tree.insert(
-            "",
-            "end",
-            values=(1, "", ""),
-            tags=("odd",)
-        )
+        # clear UI (leaves a single empty row)
+        self._load_rows()
 
 
     def _on_reset(self):
+        if self._loading is not None:
+            return
         if not messagebox.askyesno("Reset Presets", "Reset to defaults?"):
             return
         raw = read_json(self.default_path)
         self.cat_to_exts.clear()
-        for k, v in raw.items():
-            ext = k.lstrip(".").lower()
-            cats = [c.strip() for c in v.split("|")] if isinstance(v, str) else v
+        for ext, cats in _preset_items(raw):
             for cat in cats:
                 if ext not in self.cat_to_exts.setdefault(cat, []):
                     self.cat_to_exts[cat].append(ext)
@@ -403,36 +749,48 @@ class ManageSpreadsheet(ctk.CTk):
         self._load_rows()
 
     def _on_import(self):
+        if self._loading is not None:
+            return
         path = filedialog.askopenfilename(filetypes=[("JSON", "*.json")])
         if not path:
             return
         raw = read_json(path)
-        for k, v in raw.items():
-            ext = k.lstrip(".").lower()
-            cats = [c.strip() for c in v.split("|")] if isinstance(v, str) else v
+        changed = {}
+        for ext, cats in _preset_items(raw):
             for cat in cats:
                 if ext not in self.cat_to_exts.setdefault(cat, []):
                     self.cat_to_exts[cat].append(ext)
-        self._load_rows()
+                    changed[cat] = None
+
+        # Patch only the touched categories instead of rebuilding every row
+        for cat in changed:
+            if cat in self._cat_to_iid:
+                self._update_row(cat)
+            else:
+                self._insert_row(cat)
+        self._search()
 
     def _get_export_dict(self):
-        ext_to_cats = {}
+        # Built straight from the model in one pass; the Treeview is never read back
+        out = {}
         for cat, exts in self.cat_to_exts.items():
             for ext in exts:
-                ext_to_cats.setdefault(ext, []).append(cat)
-                
-        out = {}
-        for ext, cats in ext_to_cats.items():
-            out[f".{ext}"] = "|".join(cats)
+                key = f".{ext}"
+                out[key] = f"{out[key]}|{cat}" if key in out else cat
         return out
 
     def _on_export(self):
+        if self._loading is not None:
+            return
         path = filedialog.asksaveasfilename(defaultextension=".json")
         if not path:
             return
-        write_json(path, self._get_export_dict())
+        write_json(path, self._get_export_dict(), pretty=True)
 
     def _on_save(self):
+        # Saving before the presets have loaded would overwrite them with an empty table
+        if self._loading is not None:
+            return
         if not messagebox.askyesno("Save Presets", "Save current presets?"):
             return
         write_json(self.user_path, self._get_export_dict())
@@ -446,7 +804,7 @@ class ManageSpreadsheet(ctk.CTk):
 
 # ------------------ Run ------------------
 def action_manage_gui():
-    app = ManageSpreadsheet()
+    app = _lazy_tk()()
     app.mainloop()
 
 if __name__ == "__main__":
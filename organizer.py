@@ -4,20 +4,27 @@
 
 from __future__ import annotations
 import ctypes, msvcrt
-import os, sys, json, shutil, time, traceback, re, subprocess
+import os, sys, json, shutil, time, traceback, subprocess, functools, errno, marshal
 from urllib.parse import urlparse
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import Dict, Any, List, Optional, Tuple
 from action_manage_gui import action_manage_gui
 
-# UI libs detection (used only for messageboxes)
-try:
-    import customtkinter as ctk
-    CTK_AVAILABLE = True
-except Exception:
-    import tkinter as tk
-    from tkinter import messagebox, simpledialog, filedialog
-    CTK_AVAILABLE = False
+# UI libs detection (used only for the category picker and messageboxes).
+# Imported on first use so CLI-only actions skip the Tk start-up cost.
+CTK_AVAILABLE: Optional[bool] = None
+
+def _load_ui() -> bool:
+    global ctk, tk, messagebox, simpledialog, filedialog, CTK_AVAILABLE
+    if CTK_AVAILABLE is None:
+        try:
+            import customtkinter as ctk
+            CTK_AVAILABLE = True
+        except Exception:
+            import tkinter as tk
+            from tkinter import messagebox, simpledialog, filedialog
+            CTK_AVAILABLE = False
+    return CTK_AVAILABLE
 
 # optional send2trash
 try:
@@ -26,18 +33,44 @@ try:
 except Exception:
     SEND2TRASH = False
 
+# optional orjson (faster JSON parse/serialize)
+try:
+    import orjson
+    ORJSON = True
+except Exception:
+    ORJSON = False
+
 APP_NAME = "File Organizer"
 APPDATA_SUBDIR = "File Organizer"
-IGNORE_FILENAMES = {"Thumbs.db", ".DS_Store", "desktop.ini"}
-IGNORE_EXTENSIONS = {".tmp", ".crdownload", ".part", ".partial"}
-MAX_WORKERS = max(2, min(32, (os.cpu_count() or 2) * 4))
+IGNORE_FILENAMES = frozenset({"Thumbs.db", ".DS_Store", "desktop.ini"})
+IGNORE_EXTENSIONS = frozenset({".tmp", ".crdownload", ".part", ".partial"})
+MAX_WORKERS = min(32, (os.cpu_count() or 4) + 4)
+ADS_BATCH_SIZE = 64  # files per worker task when reading Zone.Identifier streams
+# Undo history: append-only JSON lines, one action per line
+UNDO_LOG = "undo_stack.jsonl"
+# Prebuilt PSL trie, rebuilt whenever the .dat file changes
+PSL_CACHE = "psl_trie.cache"
+
+# Hostname / folder-name checks used on every file in action_by_source
+# Translate tables: deleting the allowed characters leaves only the offending ones, and
+# deleting the disallowed ASCII ones sanitises a name, both in a single C-level pass
+_HOST_OK_DEL = str.maketrans("", "", "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789.-")
+_SAFE_DEL = str.maketrans("", "", "".join(c for c in map(chr, range(128)) if not (c.isalnum() or c in "-_. ")))
+
+def _looks_ipv4(host: str) -> bool:
+    # Same shape as ^\d+(\.\d+){3}$ without the regex engine
+    if host.count(".") != 3:
+        return False
+    return all(p.isdecimal() for p in host.split("."))
 
 # ---------------- Paths ----------------
+@functools.lru_cache(maxsize=1)
 def get_base_dir() -> str:
     if getattr(sys, "frozen", False):
         return os.path.dirname(sys.executable)
     return os.path.dirname(os.path.abspath(__file__))
 
+@functools.lru_cache(maxsize=1)
 def get_appdata_dir() -> str:
     appdata = os.getenv("APPDATA") or os.path.expanduser("~")
     path = os.path.join(appdata, APPDATA_SUBDIR)
@@ -48,18 +81,30 @@ def appdata_file(name: str) -> str:
     return os.path.join(get_appdata_dir(), name)
 
 # ---------------- JSON helpers ----------------
+# Both raise a ValueError subclass on bad input
+json_loads = orjson.loads if ORJSON else json.loads
+
 def read_json(path: str, default=None):
     try:
-        with open(path, "r", encoding="utf-8") as f:
-            return json.load(f)
+        with open(path, "rb") as f:
+            data = f.read()
+        return json_loads(data)
     except Exception:
         return default
 
-def write_json(path: str, data) -> None:
+def write_json(path: str, data, *, pretty: bool = False) -> None:
+    # Compact by default (files only the app itself reads); pretty=True for files meant for people
     tmp = path + ".tmp"
     try:
-        with open(tmp, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        if ORJSON:
+            with open(tmp, "wb") as f:
+                f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2 if pretty else None))
+        else:
+            with open(tmp, "w", encoding="utf-8") as f:
+                if pretty:
+                    json.dump(data, f, indent=2, ensure_ascii=False)
+                else:
+                    json.dump(data, f, separators=(",", ":"), ensure_ascii=False)
         os.replace(tmp, path)
     except Exception:
         try:
@@ -75,7 +120,7 @@ def ensure_appdata_defaults():
         "default_presets.json",
         "user_presets.json",
         "public_suffix_list.dat",
-        "undo_stack.json",
+        UNDO_LOG,
         "boot_id.txt",
     ):
         src = os.path.join(base, name)
@@ -85,8 +130,8 @@ def ensure_appdata_defaults():
                 shutil.copy2(src, dst)
             except Exception:
                 pass
-    if not os.path.exists(appdata_file("undo_stack.json")):
-        write_json(appdata_file("undo_stack.json"), {})
+    if not os.path.exists(appdata_file(UNDO_LOG)):
+        open(appdata_file(UNDO_LOG), "ab").close()
     if not os.path.exists(appdata_file("user_presets.json")):
         try:
             shutil.copy2(os.path.join(base, "default_presets.json"), appdata_file("user_presets.json"))
@@ -122,8 +167,7 @@ def check_boot_session():
     if old is None or current < old:
         # reboot detected
         try:
-            with open(appdata_file("undo_stack.json"), "w", encoding="utf-8") as fs:
-                fs.write("[]")
+            open(appdata_file(UNDO_LOG), "wb").close()
         except Exception:
             pass
 
@@ -136,167 +180,433 @@ def check_boot_session():
 # =====================================================
 import contextlib
 
+def _undo_line(action: Dict[str, Any]) -> bytes:
+    # One action per line; JSON escapes newlines inside strings, so a record never spans lines
+    if ORJSON:
+        return orjson.dumps(action) + b"\n"
+    return json.dumps(action, ensure_ascii=False, separators=(",", ":")).encode("utf-8") + b"\n"
+
+def _compact_undo_action(action: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Store paths relative to the deepest folder they all share, recorded once as "base".
+    Records without a common folder (e.g. moves across drives) are kept absolute.
+    """
+    moves = action.get("moves", [])
+    dirs = action.get("created_dirs", [])
+    paths = [p for m in moves for p in m] + dirs
+    if not paths:
+        return action
+    try:
+        base = os.path.commonpath([os.path.dirname(p) for p in paths])
+    except ValueError:
+        return action
+    prefix = base if base.endswith(os.sep) else base + os.sep
+    if not all(p.startswith(prefix) for p in paths):
+        return action  # commonpath compares case-insensitively on Windows
+    n = len(prefix)
+    return {"base": base, "moves": [[s[n:], d[n:]] for s, d in moves], "created_dirs": [d[n:] for d in dirs]}
+
+def _undo_paths(action: Dict[str, Any]) -> Tuple[List[List[str]], List[str]]:
+    """Absolute (moves, created_dirs) of a record, with or without a "base"."""
+    base = action.get("base")
+    moves = action.get("moves", [])
+    dirs = action.get("created_dirs", [])
+    if not base:
+        return moves, dirs
+    join = os.path.join
+    return [[join(base, s), join(base, d)] for s, d in moves], [join(base, d) for d in dirs]
+
 @contextlib.contextmanager
-def locked_undo_file(mode="r+"):
-    path = appdata_file("undo_stack.json")
-    
+def locked_undo_file(mode="rb+"):
+    path = appdata_file(UNDO_LOG)
+
     if not os.path.exists(path):
-        with open(path, "w", encoding="utf-8") as f:
-            f.write("[]")
+        open(path, "ab").close()
 
-    f = open(path, mode, encoding="utf-8")
-    
-    if mode in ("r+", "w", "a"):
-        f.seek(0, os.SEEK_END)
-        if f.tell() == 0:
-            f.write(" ")
-            f.flush()
+    f = open(path, mode)
 
+    # Every user of the log takes this lock, so a one-byte lock at offset 0 is enough
+    # to serialise them; Windows allows it even while the file is empty.
+    # Non-blocking attempts with a short backoff: an uncontended lock is taken
+    # immediately, a contended one is retried within microseconds of release
+    delay = 0.0001
     while True:
         try:
             f.seek(0)
-            size = max(1, os.path.getsize(path))
-            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, size)
+            msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
             break
         except OSError:
-            time.sleep(0.01)
+            time.sleep(delay)
+            delay = min(delay * 2, 0.05)
 
     try:
         yield f
     finally:
         f.seek(0)
-        size = max(1, os.path.getsize(path))
-        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, size)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
         f.close()
 
 
+def _parse_undo_log(data: bytes) -> List[Dict[str, Any]]:
+    stack = []
+    for line in data.splitlines():
+        if not line.strip():
+            continue
+        try:
+            action = json_loads(line)
+        except ValueError:
+            continue  # torn write from a crashed process
+        if isinstance(action, dict):
+            stack.append(action)
+    return stack
+
+def _undo_log_empty() -> bool:
+    # Cheap pre-check so reads of an empty or missing log skip creating, opening and locking it
+    try:
+        return os.path.getsize(appdata_file(UNDO_LOG)) == 0
+    except OSError:
+        return True
+
 def load_undo_stack() -> List[Dict[str, Any]]:
+    if _undo_log_empty():
+        return []
     try:
-        with locked_undo_file("r") as f:
+        with locked_undo_file("rb") as f:
             f.seek(0)
-            stack = json.load(f)
-            return stack if isinstance(stack, list) else []
+            data = f.read()
     except Exception:
         return []
+    return _parse_undo_log(data)
 
 def save_undo_stack(stack: List[Dict[str, Any]]) -> None:
     try:
-        with locked_undo_file("r+") as f:
+        with locked_undo_file("rb+") as f:
             f.seek(0)
             f.truncate()
-            json.dump(stack, f, indent=2)
+            f.write(b"".join(_undo_line(a) for a in stack))
             f.flush()
     except Exception:
         pass
 
 def push_undo_action(action: dict) -> None:
+    # Append-only: one line per action, no matter how long the history is
     try:
-        with locked_undo_file("r+") as f:
-            f.seek(0)
-            try:
-                stack = json.load(f)
-                if not isinstance(stack, list):
-                    stack = []
-            except Exception:
-                stack = []
-
-            stack.append(action)
-
-            f.seek(0)
-            f.truncate()
-            json.dump(stack, f, indent=2)
+        line = _undo_line(_compact_undo_action(action))
+        with locked_undo_file("ab") as f:
+            f.write(line)
             f.flush()
     except Exception:
         pass
 
+def pop_undo_action() -> Optional[Dict[str, Any]]:
+    """
+    Remove and return the newest action. Only the tail of the log is read: scan back from
+    EOF for the previous newline, then truncate the file there.
+    """
+    if _undo_log_empty():
+        return None
+    try:
+        with locked_undo_file("rb+") as f:
+            end = f.seek(0, os.SEEK_END)
+            while end > 0:
+                start = 0
+                pos = end - 1  # the record's own trailing newline
+                while pos > 0:
+                    step = min(4096, pos)
+                    f.seek(pos - step)
+                    nl = f.read(step).rfind(b"\n")
+                    if nl >= 0:
+                        start = pos - step + nl + 1
+                        break
+                    pos -= step
+                f.seek(start)
+                raw = f.read(end - start)
+                f.truncate(start)
+                end = start
+                try:
+                    action = json_loads(raw)
+                except ValueError:
+                    continue  # blank or torn line
+                if isinstance(action, dict):
+                    return action
+    except Exception:
+        pass
+    return None
+
 # ---------------- Safe move / collision ----------------
-def unique_dest(dest_dir: str, filename: str) -> str:
+def _list_names(folder: str) -> set:
+    try:
+        with os.scandir(folder) as it:
+            return {e.name.lower() for e in it}
+    except OSError:
+        return set()
+
+def _dir_key(dest_dir: str) -> str:
+    # One cache entry per folder however it is spelled (case-insensitive on Windows)
+    return os.path.normcase(os.path.abspath(dest_dir))
+
+def ensure_dest_dir(dest_dir: str, cache: Dict[Any, Any], last: Dict[str, Any]) -> None:
+    """
+    First use of dest_dir in an action: create it if missing (recorded for undo) and
+    register its names in the unique_dest cache. A folder created here starts with an
+    empty name set, so it is never listed. Later calls are a single dict lookup.
+    """
+    key = _dir_key(dest_dir)
+    if key in cache:
+        return
+    if os.path.exists(dest_dir):
+        cache[key] = _list_names(dest_dir)
+    else:
+        os.makedirs(dest_dir, exist_ok=True)
+        last["created_dirs"].append(dest_dir)
+        cache[key] = set()
+
+def unique_dest(dest_dir: str, filename: str, cache: Optional[Dict[Any, Any]] = None) -> str:
+    """
+    Free name for filename inside dest_dir, adding " (n)" on collision.
+    Actions pass one cache dict per run. It holds, per normcased dest_dir, the lowercased
+    names listed once with scandir plus every name handed out since, and per (dir, base,
+    ext) the last suffix used, so collisions are resolved in memory without a stat per
+    candidate. Without a cache the filesystem is probed directly.
+    """
     base, ext = os.path.splitext(filename)
-    candidate = filename
-    i = 1
-    while os.path.exists(os.path.join(dest_dir, candidate)):
+    if cache is None:
+        candidate = filename
+        i = 0
+        while os.path.lexists(os.path.join(dest_dir, candidate)):
+            i += 1
+            candidate = f"{base} ({i}){ext}"
+        return os.path.join(dest_dir, candidate)
+
+    dir_key = _dir_key(dest_dir)
+    names = cache.get(dir_key)
+    if names is None:
+        names = cache[dir_key] = _list_names(dest_dir)
+
+    key = (dir_key, base.lower(), ext.lower())
+    i = cache.get(key)
+    if i is None:
+        candidate = filename
+        i = 0
+    else:
+        i += 1
         candidate = f"{base} ({i}){ext}"
+    while candidate.lower() in names:
         i += 1
+        candidate = f"{base} ({i}){ext}"
+    names.add(candidate.lower())
+    cache[key] = i
     return os.path.join(dest_dir, candidate)
 
-def safe_move(src: str, dst: str) -> None:
-    os.makedirs(os.path.dirname(dst), exist_ok=True)
-    shutil.move(src, dst)
+def safe_move(src: str, dst: str, make_parent: bool = True) -> None:
+    # Callers that already ensured the destination folder pass make_parent=False
+    if make_parent:
+        os.makedirs(os.path.dirname(dst), exist_ok=True)
+    try:
+        # Same volume (the usual case): a single rename, no stat or copy fallback.
+        # os.rename (not os.replace) fails with FileExistsError on Windows if dst exists,
+        # so a stale name reservation skips the move instead of overwriting a file.
+        os.rename(src, dst)
+    except OSError as e:
+        if getattr(e, "winerror", None) == 17 or e.errno == errno.EXDEV:  # ERROR_NOT_SAME_DEVICE
+            if os.path.lexists(dst):
+                raise FileExistsError(errno.EEXIST, "Destination exists", dst)
+            shutil.move(src, dst)
+        else:
+            raise
+
+@functools.lru_cache(maxsize=1)
+def get_executor() -> ThreadPoolExecutor:
+    # One pool per process, created on first use and shared by every action
+    return ThreadPoolExecutor(max_workers=MAX_WORKERS)
+
+def run_moves(jobs: List[Tuple[str, str]], last: Dict[str, Any]) -> None:
+    """
+    Perform planned (src, dest) moves on a thread pool and record the ones that succeeded.
+    Destinations must already be reserved through unique_dest's cache and their folders
+    created, so workers never compete for a name.
+    """
+    def _move(job: Tuple[str, str]) -> bool:
+        try:
+            safe_move(job[0], job[1], make_parent=False)
+            return True
+        except Exception:
+            return False
+
+    if not jobs:
+        return
+    for (src, dest), ok in zip(jobs, get_executor().map(_move, jobs)):
+        if ok:
+            last["moves"].append([src, dest])
 
 # ---------------- Ignore tests ----------------
-def is_ignored(path: str) -> bool:
-    name = os.path.basename(path)
+def is_ignored_name(name: str, ext: Optional[str] = None) -> bool:
+    """Test a bare file name; pass ext when the caller has already split it off."""
     if name in IGNORE_FILENAMES:
         return True
-    _, ext = os.path.splitext(name)
+    if ext is None:
+        ext = os.path.splitext(name)[1]
     return ext.lower() in IGNORE_EXTENSIONS
 
+def is_ignored(path: str) -> bool:
+    return is_ignored_name(os.path.basename(path))
+
 # ---------------- PSL helper ----------------
+# Trie node flags; int keys can never collide with a (string) label
+_PSL_RULE, _PSL_EXCEPTION = 0, 1
+
 class PublicSuffixList:
+    """
+    Rules are kept in a reverse-label trie: "*.kawasaki.jp" and "!city.kawasaki.jp" become
+    {"jp": {"kawasaki": {"*": {RULE}, "city": {EXCEPTION}}}}, so a lookup is one dict hop per
+    hostname label instead of a scan over every rule.
+    """
     def __init__(self, psl_path: Optional[str] = None):
         self.path = psl_path or os.path.join(get_base_dir(), "public_suffix_list.dat")
-        self.rules: set = set()
-        self.exceptions: set = set()
+        self.trie: Dict[Any, Any] = {}
         self._load()
+        # Downloads from one site share a host; memoise per instance
+        self.get_registrable_domain = functools.lru_cache(maxsize=4096)(self._registrable_domain)
 
     def _load(self):
+        """
+        Load the trie from the AppData cache when it was built from this exact file
+        (path, mtime, size); otherwise parse the list and refresh the cache. marshal is
+        used because the trie is plain dicts/str/int and it loads several times faster
+        than re-parsing, without pickle's arbitrary-object loading.
+        """
         try:
-            with open(self.path, "r", encoding="utf-8", errors="ignore") as f:
-                for raw in f:
-                    line = raw.strip()
-                    if not line or line.startswith("//"):
-                        continue
-                    if line.startswith("!"):
-                        self.exceptions.add(line[1:])
-                    else:
-                        self.rules.add(line)
+            st = os.stat(self.path)
+        except OSError:
+            self.trie = {}
+            return
+        key = (os.path.abspath(self.path), st.st_mtime_ns, st.st_size, marshal.version)
+        cache = appdata_file(PSL_CACHE)
+        try:
+            with open(cache, "rb") as f:
+                cached_key, trie = marshal.loads(f.read())  # load(f) would read in tiny chunks
+            if cached_key == key and isinstance(trie, dict):
+                self.trie = trie
+                return
+        except Exception:
+            pass
+
+        self._parse()
+        if self.trie:
+            try:
+                tmp = f"{cache}.{os.getpid()}.tmp"
+                with open(tmp, "wb") as f:
+                    f.write(marshal.dumps((key, self.trie)))
+                os.replace(tmp, cache)
+            except Exception:
+                pass
+
+    def _parse(self):
+        try:
+            # One read and a bytes split; only rule lines (not the comment bulk) get decoded
+            with open(self.path, "rb") as f:
+                data = f.read()
+            for raw in data.split(b"\n"):
+                raw = raw.strip()
+                if not raw or raw.startswith(b"//"):
+                    continue
+                line = raw.decode("utf-8", "ignore")
+                flag = _PSL_RULE
+                if line.startswith("!"):
+                    flag, line = _PSL_EXCEPTION, line[1:]
+                node = self.trie
+                for label in reversed(line.split(".")):
+                    node = node.setdefault(label, {})
+                node[flag] = True
         except Exception:
-            self.rules = set()
-            self.exceptions = set()
+            self.trie = {}
 
-    def get_registrable_domain(self, hostname: str) -> Optional[str]:
+    def _registrable_domain(self, hostname: str) -> Optional[str]:
         if not hostname:
             return None
         hostname = hostname.strip().lower().rstrip(".")
-        if re.match(r'^\d+(\.\d+){3}$', hostname) or hostname.startswith("[") or ":" in hostname:
+        if _looks_ipv4(hostname) or hostname.startswith("[") or ":" in hostname:
             return None
         labels = hostname.split(".")
-        for ex in self.exceptions:
-            if hostname.endswith(ex):
-                parts = hostname.split(".")
-                if len(parts) > len(ex.split(".")):
-                    return ".".join(parts[-(len(ex.split(".")) + 1):])
-        match = ""
-        for i in range(len(labels)):
-            cand = ".".join(labels[i:])
-            if cand in self.rules and len(cand) > len(match):
-                match = cand
-        if match:
-            rule_parts = match.split(".")
-            if len(labels) > len(rule_parts):
-                return ".".join(labels[-(len(rule_parts) + 1):])
-            return hostname
-        if len(labels) >= 2:
-            return ".".join(labels[-2:])
-        return None
+
+        # Walk from the TLD inward; suffix_len = labels in the prevailing rule (0 = none matched)
+        suffix_len = 0
+        node = self.trie
+        for depth, label in enumerate(reversed(labels), 1):
+            wild = node.get("*")
+            child = node.get(label)
+            if child is not None and _PSL_EXCEPTION in child:
+                # An exception beats everything: its parent is the public suffix
+                suffix_len = depth - 1
+                break
+            if (child is not None and _PSL_RULE in child) or (wild is not None and _PSL_RULE in wild):
+                suffix_len = depth
+            if child is None:
+                break
+            node = child
+
+        if not suffix_len:
+            # Default "*" rule
+            return ".".join(labels[-2:]) if len(labels) >= 2 else None
+        if len(labels) > suffix_len:
+            return ".".join(labels[-(suffix_len + 1):])
+        return hostname
+
+@functools.lru_cache(maxsize=4)
+def _get_psl(path: str, mtime: float) -> PublicSuffixList:
+    # One parsed list per file version; the trie is read-only after the build, so the
+    # By Source worker threads can share it
+    return PublicSuffixList(path)
+
+def get_psl(path: str) -> PublicSuffixList:
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        mtime = 0.0
+    return _get_psl(path, mtime)
 
 # ---------------- ADS reader ----------------
 def get_hosturl_from_ads(path: str) -> Optional[str]:
     ads = path + ":Zone.Identifier"
     try:
-        with open(ads, "r", encoding="utf-8", errors="ignore") as f:
-            for line in f:
-                if line.strip().startswith("HostUrl="):
-                    return line.strip()[len("HostUrl="):].strip()
+        # Raw fd read: no buffered-file object for a stream of a few hundred bytes.
+        # 64 KiB comfortably covers a long ReferrerUrl ahead of HostUrl
+        fd = os.open(ads, os.O_RDONLY | getattr(os, "O_BINARY", 0))
+        try:
+            data = os.read(fd, 65536)
+        finally:
+            os.close(fd)
     except Exception:
         return None
-    return None
+    # Anchor on a line start so a "HostUrl=" inside a ReferrerUrl query is not matched
+    idx = (b"\n" + data).find(b"\nHostUrl=")
+    if idx < 0:
+        return None
+    end = data.find(b"\n", idx)
+    return data[idx + 8:end if end >= 0 else None].decode("utf-8", "ignore").strip()
 
 # ---------------- presets ----------------
-def load_presets_merge() -> Dict[str, str]:
-    users = read_json(appdata_file("user_presets.json"), {}) or {}
+@functools.lru_cache(maxsize=1)
+def _load_presets(path: str, mtime_ns: int, size: int) -> Dict[str, str]:
+    users = read_json(path, {}) or {}
     return {k.lower(): v for k, v in users.items()}
 
+def load_presets_merge() -> Dict[str, str]:
+    """
+    Lowercased user presets, re-read only when the file's mtime or size changes.
+    The returned dict is shared between calls; treat it as read-only.
+    """
+    path = appdata_file("user_presets.json")
+    try:
+        st = os.stat(path)
+        return _load_presets(path, st.st_mtime_ns, st.st_size)
+    except OSError:
+        return {}
+
+def invalidate_presets_cache() -> None:
+    # For in-process writers whose save may land within the same mtime tick
+    _load_presets.cache_clear()
+
 # ---------------- Action: Blacklist ----------------
 def is_blacklisted(path: str, is_items: bool = False) -> bool:
     try:
@@ -354,41 +664,48 @@ def is_blacklisted(path: str, is_items: bool = False) -> bool:
     except Exception:
         return True # Safe default
 
-def get_category_for_path(path: str, presets: Dict[str, str], current_folder: str = "") -> Tuple[str, bool]:
-    if os.path.isdir(path):
-        val = presets.get(".folder", "Other Files")
-    else:
-        _, ext = os.path.splitext(path)
-        val = presets.get(ext.lower(), "Other Files")
-        
-    cats = [c.strip() for c in str(val).split("|")]
-    
+def _category_rule(val: str) -> Tuple[str, frozenset]:
+    """Split a preset value into its destination category and whitelisted folder names."""
     dest_cat = "Other Files"
-    is_whitelisted = False
-    
-    for c in cats:
+    wl_targets = set()
+    for c in str(val).split("|"):
+        c = c.strip()
         if c.lower().startswith("whitelist."):
-            wl_target = c.split(".", 1)[1].lower()
-            if os.path.basename(current_folder).lower() == wl_target:
-                is_whitelisted = True
+            wl_targets.add(c.split(".", 1)[1].lower())
         else:
             dest_cat = c
-            
+    return dest_cat, frozenset(wl_targets)
+
+def get_category_for_path(path: str, presets: Dict[str, str], current_folder: str = "",
+                          cache: Optional[Dict[str, Tuple[str, frozenset]]] = None) -> Tuple[str, bool]:
+    # cache maps the raw extension to its parsed rule for the duration of one action
+    key = ".folder" if os.path.isdir(path) else os.path.splitext(path)[1]
+    rule = cache.get(key) if cache is not None else None
+    if rule is None:
+        rule = _category_rule(presets.get(key.lower(), "Other Files"))
+        if cache is not None:
+            cache[key] = rule
+    dest_cat, wl_targets = rule
+    is_whitelisted = bool(wl_targets) and os.path.basename(current_folder).lower() in wl_targets
     return dest_cat, is_whitelisted
 
 # ---------------- Action: By Type ----------------
 def action_by_type(paths: List[str], is_items: bool) -> int:
     presets = load_presets_merge()
+    ext_rules = {}
+    dest_cache = {}
+    jobs = []
     last = {"moves": [], "created_dirs": []}
-    created = set()
     
     for base_arg in paths:
         if is_blacklisted(base_arg, is_items):
             continue
-            
+        # Normalise once; every source and destination below is joined onto this
+        base_arg = os.path.abspath(base_arg)
+
         targets = []
         if is_items:
-            parent_dir = os.path.dirname(os.path.abspath(base_arg))
+            parent_dir = os.path.dirname(base_arg)
             if os.path.isfile(base_arg):
                 targets.append((base_arg, parent_dir))
             elif os.path.isdir(base_arg):
@@ -398,39 +715,38 @@ def action_by_type(paths: List[str], is_items: bool) -> int:
         else:
             if not os.path.isdir(base_arg):
                 continue
-            for name in os.listdir(base_arg):
-                item_path = os.path.join(base_arg, name)
-                if os.path.isfile(item_path):
-                    targets.append((item_path, os.path.abspath(base_arg)))
-
+            folder_abs = base_arg
+            # scandir entries carry the file attributes from the directory listing,
+            # so is_file() needs no extra stat per entry
+            with os.scandir(base_arg) as it:
+                for entry in it:
+                    if entry.is_file():
+                        targets.append((entry.path, folder_abs))
+
+        # All targets of one path argument share a folder, so the destination depends
+        # only on the extension: resolve it once per extension (None = whitelisted, skip).
+        # Targets are always files, so the folder-into-itself guard is not needed here.
+        dispatch = {}
         for f, folder in targets:
-            if not os.path.exists(f) or is_ignored(f) or os.path.abspath(f) == folder:
-                continue
-                
-            dest_cat, is_whitelisted = get_category_for_path(f, presets, folder)
-            
-            if not is_items and is_whitelisted:
+            name = os.path.basename(f)
+            ext = os.path.splitext(name)[1]
+            if not os.path.exists(f) or is_ignored_name(name, ext):
                 continue
 
-            dest_dir = os.path.join(folder, dest_cat)
-            
-            # Prevent moving a folder into its own subfolder
-            if os.path.isdir(f) and os.path.abspath(dest_dir).startswith(os.path.abspath(f) + os.sep):
+            if ext in dispatch:
+                dest_dir = dispatch[ext]
+            else:
+                dest_cat, is_whitelisted = get_category_for_path(f, presets, folder, ext_rules)
+                dest_dir = None if (not is_items and is_whitelisted) else os.path.join(folder, dest_cat)
+                dispatch[ext] = dest_dir
+            if dest_dir is None:
                 continue
 
-            if not os.path.exists(dest_dir):
-                os.makedirs(dest_dir, exist_ok=True)
-                if dest_dir not in created:
-                    created.add(dest_dir)
-                    last["created_dirs"].append(os.path.abspath(dest_dir))
-                    
-            dest = unique_dest(dest_dir, os.path.basename(f))
-            try:
-                safe_move(f, dest)
-                last["moves"].append([os.path.abspath(f), os.path.abspath(dest)])
-            except Exception:
-                pass
+            ensure_dest_dir(dest_dir, dest_cache, last)
 
+            jobs.append((f, unique_dest(dest_dir, name, dest_cache)))
+
+    run_moves(jobs, last)
     if last["moves"] or last["created_dirs"]:
         push_undo_action(last)
     return 0
@@ -440,8 +756,8 @@ def action_by_type(paths: List[str], is_items: bool) -> int:
 def host_valid(hostname: Optional[str]) -> bool:
     if not hostname:
         return False
-    if re.match(r'^[A-Za-z0-9\.\-]+$', hostname):
-        if re.match(r'^\d+(\.\d+){3}$', hostname):
+    if hostname.isascii() and not hostname.translate(_HOST_OK_DEL):
+        if _looks_ipv4(hostname):
             return False
         if hostname.lower() in ("localhost",):
             return False
@@ -449,7 +765,10 @@ def host_valid(hostname: Optional[str]) -> bool:
     return False
 
 def sanitize_folder_name(name: str) -> Optional[str]:
-    cleaned = re.sub(r'[^A-Za-z0-9\-_\. ]', '', name).strip()
+    cleaned = name.translate(_SAFE_DEL)
+    if not cleaned.isascii():
+        cleaned = cleaned.encode("ascii", "ignore").decode("ascii")
+    cleaned = cleaned.strip()
     return cleaned.capitalize() if cleaned else None
 
 def _parse_ads_domain_simple(path: str, psl: PublicSuffixList) -> Tuple[str, Optional[str]]:
@@ -472,59 +791,66 @@ def _parse_ads_domain_simple(path: str, psl: PublicSuffixList) -> Tuple[str, Opt
     except Exception:
         return (path, None)
 
+def _parse_ads_domain_batch(files: List[str], psl: PublicSuffixList) -> List[Tuple[str, Optional[str]]]:
+    return [_parse_ads_domain_simple(f, psl) for f in files]
+
 # ---------------- Action: By Source ----------------
 def action_by_source(paths: List[str], is_items: bool) -> int:
-    psl = PublicSuffixList(appdata_file("public_suffix_list.dat"))
+    psl = get_psl(appdata_file("public_suffix_list.dat"))
     last = {"moves": [], "created_dirs": []}
-    created = set()
+    dest_cache = {}
     results = []
+    files = []
+    folder_map = {}
     
     for base_arg in paths:
         if is_blacklisted(base_arg, is_items):
             continue
-            
+        # Normalise once; every source and destination below is joined onto this
+        base_arg = os.path.abspath(base_arg)
+
         targets = []
         if is_items:
-            parent_dir = os.path.dirname(os.path.abspath(base_arg))
+            parent_dir = os.path.dirname(base_arg)
             if os.path.isfile(base_arg):
                 targets.append((base_arg, parent_dir))
             elif os.path.isdir(base_arg):
-                for root, _, files in os.walk(base_arg):
-                    for fname in files:
+                for root, _, fnames in os.walk(base_arg):
+                    for fname in fnames:
                         targets.append((os.path.join(root, fname), parent_dir))
         else:
             if not os.path.isdir(base_arg):
                 continue
-            for name in os.listdir(base_arg):
-                item_path = os.path.join(base_arg, name)
-                if os.path.isfile(item_path):
-                    targets.append((item_path, os.path.abspath(base_arg)))
+            folder_abs = base_arg
+            # scandir entries carry the file attributes from the directory listing,
+            # so is_file() needs no extra stat per entry
+            with os.scandir(base_arg) as it:
+                for entry in it:
+                    if entry.is_file():
+                        targets.append((entry.path, folder_abs))
                 
-        # By Source only operates on files since folders don't have Zone.Identifier downloads natively
-        files = [f for f, _ in targets if os.path.isfile(f) and not is_ignored(f)]
-        folder_map = {f: folder for f, folder in targets}
-
-    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as ex:
-        # Use map instead of submitting all futures at once to save memory
-        valid_files = [f for f in files if not is_ignored(f)]
-        for f, domain in ex.map(lambda f: _parse_ads_domain_simple(f, psl), valid_files):
-            try:
-                results.append((f, domain))
-            except Exception:
-                continue
+        # By Source only operates on files since folders don't have Zone.Identifier downloads natively;
+        # every target above is already known to be a file, so no further stat is needed
+        files.extend(f for f, _ in targets if not is_ignored(f))
+        folder_map.update(targets)
+
+    # Each ADS read is tiny, so hand workers batches to keep executor overhead per file low;
+    # a folder that fits in one batch (the usual Downloads run) is read inline
+    batches = [files[i:i + ADS_BATCH_SIZE] for i in range(0, len(files), ADS_BATCH_SIZE)]
+    if len(batches) <= 1:
+        results = _parse_ads_domain_batch(files, psl)
+    else:
+        for batch in get_executor().map(lambda b: _parse_ads_domain_batch(b, psl), batches):
+            results.extend(batch)
 
     for f, domain in results:
         try:
             folder = folder_map[f]
             dest_dir = os.path.join(folder, domain or "Unknown Sources")
-            if not os.path.exists(dest_dir):
-                os.makedirs(dest_dir, exist_ok=True)
-                if dest_dir not in created:
-                    created.add(dest_dir)
-                    last["created_dirs"].append(os.path.abspath(dest_dir))
-            dest = unique_dest(dest_dir, os.path.basename(f))
-            safe_move(f, dest)
-            last["moves"].append([os.path.abspath(f), os.path.abspath(dest)])
+            ensure_dest_dir(dest_dir, dest_cache, last)
+            dest = unique_dest(dest_dir, os.path.basename(f), dest_cache)
+            safe_move(f, dest, make_parent=False)
+            last["moves"].append([f, dest])
         except Exception:
             continue
 
@@ -535,16 +861,20 @@ def action_by_source(paths: List[str], is_items: bool) -> int:
 # ---------------- Action: Category (GUI + CLI) ----------------
 def action_category_cli(paths: List[str], category: str, is_items: bool) -> int:
     presets = load_presets_merge()
+    ext_rules = {}
+    dest_cache = {}
+    jobs = []
     last = {"moves": [], "created_dirs": []}
-    created = set()
 
     for base_arg in paths:
         if is_blacklisted(base_arg, is_items):
             continue
-            
+        # Normalise once; every source and destination below is joined onto this
+        base_arg = os.path.abspath(base_arg)
+
         targets = []
         if is_items:
-            parent_dir = os.path.dirname(os.path.abspath(base_arg))
+            parent_dir = os.path.dirname(base_arg)
             if os.path.isfile(base_arg):
                 targets.append((base_arg, parent_dir))
             elif os.path.isdir(base_arg):
@@ -554,16 +884,19 @@ def action_category_cli(paths: List[str], category: str, is_items: bool) -> int:
         else:
             if not os.path.isdir(base_arg):
                 continue
-            for name in os.listdir(base_arg):
-                item_path = os.path.join(base_arg, name)
-                if os.path.isfile(item_path):
-                    targets.append((item_path, os.path.abspath(base_arg)))
+            folder_abs = base_arg
+            # scandir entries carry the file attributes from the directory listing,
+            # so is_file() needs no extra stat per entry
+            with os.scandir(base_arg) as it:
+                for entry in it:
+                    if entry.is_file():
+                        targets.append((entry.path, folder_abs))
 
         for f, folder in targets:
-            if not os.path.exists(f) or is_ignored(f) or os.path.abspath(f) == folder:
+            if not os.path.exists(f) or is_ignored(f) or f == folder:
                 continue
             
-            dest_cat, is_whitelisted = get_category_for_path(f, presets, folder)
+            dest_cat, is_whitelisted = get_category_for_path(f, presets, folder, ext_rules)
             
             if not is_items and is_whitelisted:
                 continue
@@ -572,21 +905,13 @@ def action_category_cli(paths: List[str], category: str, is_items: bool) -> int:
                 dest_dir = os.path.join(folder, category)
                 
                 # Prevent moving folder into its own subfolder
-                if os.path.isdir(f) and os.path.abspath(dest_dir).startswith(os.path.abspath(f) + os.sep):
+                if os.path.isdir(f) and dest_dir.startswith(f + os.sep):
                     continue
                     
-                if not os.path.exists(dest_dir):
-                    os.makedirs(dest_dir, exist_ok=True)
-                    if dest_dir not in created:
-                        created.add(dest_dir)
-                        last["created_dirs"].append(os.path.abspath(dest_dir))
-                dest = unique_dest(dest_dir, os.path.basename(f))
-                try:
-                    safe_move(f, dest)
-                    last["moves"].append([os.path.abspath(f), os.path.abspath(dest)])
-                except Exception:
-                    pass
+                ensure_dest_dir(dest_dir, dest_cache, last)
+                jobs.append((f, unique_dest(dest_dir, os.path.basename(f), dest_cache)))
 
+    run_moves(jobs, last)
     if last["moves"] or last["created_dirs"]:
         push_undo_action(last)
     return 0
@@ -595,7 +920,7 @@ def action_category_gui(paths: List[str], is_items: bool) -> int:
     presets = load_presets_merge()
     cats = sorted(set(presets.values()) | {"Images", "Videos", "Audio", "Other Files"})
     # lightweight GUI selection if CustomTkinter available
-    if CTK_AVAILABLE:
+    if _load_ui():
         root = ctk.CTk(); root.title("Organize by Category"); root.geometry("420x480")
         var = ctk.StringVar(value=cats[0])
         frame = ctk.CTkFrame(root); frame.pack(fill="both", expand=True, padx=12, pady=12)
@@ -618,56 +943,98 @@ def action_category_gui(paths: List[str], is_items: bool) -> int:
     return action_category_cli(paths, chosen, is_items)
 
 # ---------------- Action: File Puller ----------------
+def _iter_files(root: str, include_root_files: bool = True):
+    """
+    Yield the non-ignored files below root, depth first, using scandir entry types.
+    Like os.walk, symlinked folders are listed but not descended into and unreadable
+    folders are skipped. Each folder is listed in full before any of its files are
+    yielded further down, so moving files into root (or outside the tree) while
+    iterating never feeds them back into the walk.
+    """
+    stack = [root]
+    while stack:
+        d = stack.pop()
+        try:
+            with os.scandir(d) as it:
+                entries = list(it)
+        except OSError:
+            continue
+        for e in entries:
+            try:
+                if e.is_dir():
+                    if not e.is_symlink():
+                        stack.append(e.path)
+                    continue
+            except OSError:
+                continue
+            if (include_root_files or d != root) and not is_ignored_name(e.name):
+                yield e.path
+
+def _pull_one(dest_dir: str, roots: List[str], mode: str,
+              dest_cache: Optional[Dict[Any, Any]] = None) -> Dict[str, Any]:
+    """Pull every file below roots into dest_dir; returns this group's undo record."""
+    part = {"moves": [], "created_dirs": []}
+    if dest_cache is None:
+        dest_cache = {}
+    for p in roots:
+        # Files are moved as they are discovered; the walk never revisits dest_dir
+        for src in _iter_files(p, include_root_files=(mode != "here")):
+            ensure_dest_dir(dest_dir, dest_cache, part)
+            dest = unique_dest(dest_dir, os.path.basename(src), dest_cache)
+            try:
+                safe_move(src, dest, make_parent=False)
+            except OSError:
+                continue  # Locked file or a name taken behind our back: leave it in place
+            part["moves"].append([src, dest])
+    return part
+
+def _groups_overlap(groups: List[Tuple[str, List[str]]]) -> bool:
+    """True if any group's roots or destination lie inside another group's roots."""
+    keys = [[os.path.normcase(p) for p in [d] + roots] for d, roots in groups]
+    for i, (_, roots) in enumerate(groups):
+        for j, paths in enumerate(keys):
+            if i == j:
+                continue
+            for r in roots:
+                r = os.path.normcase(r)
+                if any(p == r or p.startswith(r.rstrip(os.sep) + os.sep) for p in paths):
+                    return True
+    return False
+
 def action_file_puller(paths: List[str], mode: str, is_items: bool) -> int:
     last = {"moves": [], "created_dirs": []}
 
-    targets = []
-    if is_items:
-        targets = [p for p in paths if os.path.isdir(p) and not is_blacklisted(p, is_items)]
-    else:
-        targets = [p for p in paths if os.path.isdir(p) and not is_blacklisted(p, is_items)]
+    targets = [os.path.abspath(p) for p in paths if os.path.isdir(p) and not is_blacklisted(p, is_items)]
 
+    # Targets sharing a destination are pulled together so they share its name cache.
+    # Groups are keyed case-insensitively on Windows (normcase), so differently-cased
+    # spellings of one folder never end up in two parallel groups with separate caches;
+    # the first spelling seen is the one used for joins.
+    groups: Dict[str, Tuple[str, List[str]]] = {}
+    order = []
     for p in targets:
-        files_to_move = []
-        for root, _, files in os.walk(p):
-            for fname in files:
-                src = os.path.join(root, fname)
-                if is_ignored(src):
-                    continue
-                files_to_move.append(src)
-
-        if not files_to_move:
-            continue
-
         if mode == "above":
-            parent = os.path.dirname(p)
-            if not parent:
+            dest_dir = os.path.dirname(p)
+            if not dest_dir:
                 continue
-
-            for src in files_to_move:
-                dest = unique_dest(parent, os.path.basename(src))
-                safe_move(src, dest)
-                last["moves"].append([os.path.abspath(src), os.path.abspath(dest)])
-
         elif mode == "here":
-            for src in files_to_move:
-                if os.path.dirname(src) == p:
-                    continue
-                dest = unique_dest(p, os.path.basename(src))
-                safe_move(src, dest)
-                last["moves"].append([os.path.abspath(src), os.path.abspath(dest)])
-
+            dest_dir = p
         else:  # mode == "all"
-            parent = os.path.dirname(p) or p
-            dest_dir = os.path.join(parent, "Files Bin")
-            if not os.path.exists(dest_dir):
-                os.makedirs(dest_dir, exist_ok=True)
-                last["created_dirs"].append(os.path.abspath(dest_dir))
-
-            for src in files_to_move:
-                dest = unique_dest(dest_dir, os.path.basename(src))
-                safe_move(src, dest)
-                last["moves"].append([os.path.abspath(src), os.path.abspath(dest)])
+            dest_dir = os.path.join(os.path.dirname(p) or p, "Files Bin")
+        key = os.path.normcase(dest_dir)
+        groups.setdefault(key, (dest_dir, []))[1].append(p)
+        order.append((key, p))
+
+    # Independent groups run in parallel; nested selections keep the selection order
+    jobs = list(groups.values())
+    if len(jobs) > 1 and not _groups_overlap(jobs):
+        parts = get_executor().map(lambda job: _pull_one(job[0], job[1], mode), jobs)
+    else:
+        dest_cache = {}
+        parts = (_pull_one(groups[key][0], [p], mode, dest_cache) for key, p in order)
+    for part in parts:
+        last["moves"].extend(part["moves"])
+        last["created_dirs"].extend(part["created_dirs"])
 
     # Only push undo if something actually happened
     if last["moves"] or last["created_dirs"]:
@@ -678,45 +1045,87 @@ def action_file_puller(paths: List[str], mode: str, is_items: bool) -> int:
 
 
 # ---------------- Delete Empty Folders ----------------
+def trash_paths(paths: List[str]) -> None:
+    if not paths:
+        return
+    try:
+        send2trash(paths)  # send2trash hands a list to the shell as a single batch
+        return
+    except Exception:
+        pass
+    # Older send2trash without list support, or one locked path failing the batch
+    for p in paths:
+        try:
+            send2trash(p)
+        except Exception:
+            pass
+
 def action_delete_empty(paths: List[str], is_items: bool) -> int:
     targets = [os.path.abspath(p) for p in paths if os.path.isdir(p) and not is_blacklisted(p, is_items)]
     if not targets:
         return 1
 
     for folder in targets:
-        while True:
-            deleted_any = False
+        # Post-order over scandir listings: each folder is listed once and entry types come
+        # from the listing. A folder is empty when it holds no files (symlinks count as
+        # content) and every subfolder is empty; `order` keeps children before parents.
+        empty = set()
+        order = []
+        stack: List[Tuple[str, Optional[Tuple[bool, List[str]]]]] = [(folder, None)]
+        while stack:
+            root, listing = stack.pop()
+            if listing is None:
+                try:
+                    with os.scandir(root) as it:
+                        entries = list(it)
+                except OSError:
+                    continue  # Unreadable → left alone, and so is its parent
+                dirs = []
+                has_files = False
+                for e in entries:
+                    try:
+                        is_dir = e.is_dir(follow_symlinks=False)
+                    except OSError:
+                        is_dir = False
+                    if is_dir:
+                        dirs.append(e.path)
+                    else:
+                        has_files = True
+                stack.append((root, (has_files, dirs)))
+                stack.extend((d, None) for d in dirs)
+                continue
 
-            for root, dirs, files in os.walk(folder, topdown=False):
-                # Only prevent deletion of the root directory if we executed on its background 
-                if not is_items and root == folder:
-                    continue
+            # Only prevent deletion of the root directory if we executed on its background 
+            if not is_items and root == folder:
+                continue
 
-                if not dirs and not files:
-                    try:
-                        if SEND2TRASH:
-                            send2trash(root)   # Move to Recycle Bin
-                        else:
-                            os.rmdir(root)     # Safe native fallback, only works if actually empty
-                        deleted_any = True
-                    except Exception:
-                        pass # Locked / permission denied → skip
-
-            if not deleted_any:
-                break
+            has_files, dirs = listing
+            if not has_files and all(d in empty for d in dirs):
+                empty.add(root)
+                order.append(root)
+
+        if SEND2TRASH:
+            # Move to Recycle Bin: only the top folder of each empty subtree (its empty
+            # subfolders go with it), all in one call instead of one shell operation each
+            trash_paths([d for d in order if os.path.dirname(d) not in empty])
+        else:
+            for d in order:
+                try:
+                    os.rmdir(d)  # Safe native fallback, only works if actually empty
+                except OSError:
+                    pass # Locked / permission denied → skip, which also keeps its parent
 
     return 0
 
 
 # ---------------- Undo (Explorer-like, multi-level) ----------------
 def action_undo(context: Optional[str] = None) -> int:
-    stack = load_undo_stack()
-    if not stack:
+    action = pop_undo_action()
+    if not action:
         return 1
+    moves, created_dirs = _undo_paths(action)
 
-    action = stack.pop()
-
-    for src, dst in reversed(action.get("moves", [])):
+    for src, dst in reversed(moves):
         try:
             if not os.path.exists(dst):
                 continue
@@ -731,18 +1140,17 @@ def action_undo(context: Optional[str] = None) -> int:
                         final = candidate
                         break
                     i += 1
-            safe_move(dst, final)
+            safe_move(dst, final, make_parent=False)
         except Exception:
             continue
 
-    for d in sorted(action.get("created_dirs", []), key=len, reverse=True):
+    # Deepest first; rmdir itself refuses non-empty or missing folders
+    for d in sorted(set(created_dirs), key=lambda d: d.count(os.sep), reverse=True):
         try:
-            if os.path.isdir(d) and not os.listdir(d):
-                os.rmdir(d)
-        except Exception:
+            os.rmdir(d)
+        except OSError:
             continue
 
-    save_undo_stack(stack)
     return 0
 
 # ---------------- Undo all at once ----------------
@@ -755,9 +1163,10 @@ def action_undo_all() -> int:
     # Undo actions in reverse order (latest → oldest)
     while stack:
         action = stack.pop()
+        moves, created_dirs = _undo_paths(action)
 
         # Undo file moves
-        for src, dst in reversed(action.get("moves", [])):
+        for src, dst in reversed(moves):
             try:
                 if not os.path.exists(dst):
                     continue
@@ -775,16 +1184,15 @@ def action_undo_all() -> int:
                             break
                         i += 1
 
-                safe_move(dst, final)
+                safe_move(dst, final, make_parent=False)
             except Exception:
                 continue
 
         # Remove empty created folders
-        for d in sorted(action.get("created_dirs", []), key=len, reverse=True):
+        for d in sorted(set(created_dirs), key=lambda d: d.count(os.sep), reverse=True):
             try:
-                if os.path.isdir(d) and not os.listdir(d):
-                    os.rmdir(d)
-            except Exception:
+                os.rmdir(d)
+            except OSError:
                 continue
 
     # Clear undo stack completely
@@ -798,13 +1206,18 @@ def main(argv: List[str]) -> int:
     check_boot_session()
 
     if len(argv) < 2:
-        print("Usage: organizer.exe <action> [--items/--background] <path1> <path2> ...")
+        print("Usage: organizer.exe <action> [--items/--background] [--category=<name>] <path1> <path2> ...")
         return 1
 
     action = argv[1].lower()
     
     is_items = "--items" in argv
     is_background = "--background" in argv
+
+    # "category" with --category=<name> organizes straight into that category, no picker
+    category = next((a.split("=", 1)[1] for a in argv[2:] if a.startswith("--category=")), None)
+
+    args: List[str] = [a for a in argv[2:] if a not in ("--items", "--background") and not a.startswith("--category=")]
     
     # default to items if they passed explicit paths, unless --background explicitly requested
     if is_items:
@@ -814,9 +1227,8 @@ def main(argv: List[str]) -> int:
     else:
         # Default behavior: if they pass a single directory, usually it's background for backwards compatibility
         # If they pass multiple files, it's items.
-        mode_is_items = len(argv) > 3 or (len(argv) > 2 and os.path.isfile(argv[2]))
-        
-    args: List[str] = [a for a in argv[2:] if a not in ("--items", "--background")]
+        # Counted on the paths alone, so a --category=<name> flag doesn't switch the mode.
+        mode_is_items = len(args) > 1 or (len(args) == 1 and os.path.isfile(args[0]))
 
     try:
         if action == "type":
@@ -824,7 +1236,11 @@ def main(argv: List[str]) -> int:
         elif action == "source":
             return action_by_source(args, is_items=mode_is_items) if args else 1
         elif action == "category":
-            return action_category_gui(args, is_items=mode_is_items) if args else 1
+            if not args:
+                return 1
+            if category:
+                return action_category_cli(args, category, is_items=mode_is_items)
+            return action_category_gui(args, is_items=mode_is_items)
         elif action == "pull":
             return action_file_puller(args, mode="all", is_items=mode_is_items)
         elif action == "pull_here":
@@ -851,6 +1267,7 @@ def main(argv: List[str]) -> int:
         except Exception:
             pass
         try:
+            _load_ui()
             messagebox.showerror("Error", f"An error occurred: {e}")
         except Exception:
             pass